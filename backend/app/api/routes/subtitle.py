@@ -46,7 +46,7 @@ async def generate_subtitles(video_id: str, request: GenerateSubtitlesRequest =
         default_style = request.default_style if request else None
         language = request.language if request else "en"
         
-        subtitles = await subtitle_service.generate_subtitles(
+        subtitles, subtitles_language = await subtitle_service.generate_subtitles(
             str(video_path),
             video_id,
             default_style,
@@ -55,6 +55,7 @@ async def generate_subtitles(video_id: str, request: GenerateSubtitlesRequest =
         
         # Update video with subtitles
         video.subtitles = subtitles
+        video.language = subtitles_language
         await video_service.update_video(video)
         
         return {
@@ -312,9 +313,13 @@ async def translate_subtitles(video_id: str, request: TranslateRequest):
     try:
         translated = await subtitle_service.translate_subtitles(
             video.subtitles,
-            request.target_language
+            request.target_language,
+            video.language
         )
         
+        # Only relabel the language if a translation actually happened
+        if translated is not video.subtitles:
+            video.language = request.target_language
         video.subtitles = translated
         await video_service.update_video(video)
         
@@ -11,7 +11,7 @@ from app.models.video import (
     AudioEnhanceRequest, AudioEnhanceResponse,
     ViralClipsRequest, ViralClipsResponse
 )
-from app.services.video_service import video_service
+from app.services.video_service import video_service, UploadTooLargeError
 
 settings = get_settings()
 router = APIRouter(prefix="/video", tags=["Video"])
@@ -28,19 +28,19 @@ async def upload_video(file: UploadFile = File(...)):
             detail=f"Invalid file type. Allowed: {settings.ALLOWED_VIDEO_EXTENSIONS}"
         )
     
-    # Read file content
-    content = await file.read()
-    
-    # Check file size
-    if len(content) > settings.MAX_VIDEO_SIZE_MB * 1024 * 1024:
+    # Stream to disk, checking the size as it is written
+    try:
+        video = await video_service.save_uploaded_video(
+            file.file,
+            file.filename,
+            max_size=settings.MAX_VIDEO_SIZE_MB * 1024 * 1024
+        )
+    except UploadTooLargeError:
         raise HTTPException(
             status_code=400,
             detail=f"File too large. Maximum size: {settings.MAX_VIDEO_SIZE_MB}MB"
         )
     
-    # Save video
-    video = await video_service.save_uploaded_video(content, file.filename)
-    
     return VideoUploadResponse(
         id=video.id,
         filename=video.filename,
@@ -111,10 +111,20 @@ async def export_video(video_id: str, request: VideoExportRequest):
         raise HTTPException(status_code=404, detail="Video not found")
     
     try:
-        export_path = await video_service.export_with_subtitles(
-            video_id,
-            request.output_format
-        )
+        if request.trim_silence or request.to_landscape or not request.burn_subtitles:
+            # Apply every requested step in a single encode
+            export_path = await video_service.finalize_export(
+                video_id,
+                trim_silence=request.trim_silence,
+                to_landscape=request.to_landscape,
+                burn_subs=request.burn_subtitles,
+                output_format=request.output_format
+            )
+        else:
+            export_path = await video_service.export_with_subtitles(
+                video_id,
+                request.output_format
+            )
         
         return VideoExportResponse(
             id=video_id,
@@ -160,7 +170,8 @@ async def trim_silence(video_id: str, request: TrimSilenceRequest):
             video_id,
             request.silence_threshold,
             request.min_silence_duration,
-            request.padding
+            request.padding,
+            request.stream_copy
         )
         
         return TrimSilenceResponse(
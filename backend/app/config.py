@@ -51,6 +51,7 @@ class Settings(BaseSettings):
     # Video Settings
     MAX_VIDEO_SIZE_MB: int = 500
     ALLOWED_VIDEO_EXTENSIONS: list = [".mp4", ".avi", ".mov", ".mkv", ".webm"]
+    VIDEO_ENCODER: str = "auto"  # auto, libx264, h264_nvenc, h264_qsv, h264_videotoolbox
     
     # Subtitle Defaults
     DEFAULT_FONT: str = "Arial"
@@ -94,6 +95,75 @@ class Settings(BaseSettings):
             pass
         return "ffprobe"
 
+    @property
+    def has_libopus(self) -> bool:
+        """Whether FFmpeg was built with the libopus encoder."""
+        return "libopus" in ffmpeg_capabilities(self.ffmpeg_binary, "-encoders")
+
+    @property
+    def has_libass(self) -> bool:
+        """Whether FFmpeg was built with libass (the `ass` subtitle filter)."""
+        return "ass" in ffmpeg_capabilities(self.ffmpeg_binary, "-filters")
+
+    @property
+    def video_encoder(self) -> str:
+        """H.264 encoder to use: VIDEO_ENCODER, or the first working hardware one."""
+        if self.VIDEO_ENCODER != "auto":
+            return self.VIDEO_ENCODER
+        return detect_video_encoder(self.ffmpeg_binary)
+    
+    def warm_ffmpeg_probes(self) -> None:
+        """Run the cached FFmpeg capability probes now (blocking; call off the event loop)."""
+        self.video_encoder
+        self.has_libass
+        self.has_libopus
+
+
+@lru_cache()
+def ffmpeg_capabilities(ffmpeg_binary: str, listing: str) -> frozenset:
+    """Names from an FFmpeg listing such as -encoders or -filters (run once)."""
+    import subprocess
+    try:
+        result = subprocess.run(
+            [ffmpeg_binary, "-hide_banner", listing],
+            capture_output=True, text=True
+        )
+    except OSError:
+        return frozenset()
+    # Entries look like " V....D libx264   libx264 H.264 ..." (flags, name, ...)
+    return frozenset(
+        parts[1] for parts in (line.split() for line in result.stdout.splitlines())
+        if len(parts) > 1
+    )
+
+
+@lru_cache()
+def detect_video_encoder(ffmpeg_binary: str) -> str:
+    """Pick a hardware H.264 encoder that actually works here, else libx264.
+    
+    Builds often list nvenc/qsv without a usable device, so each candidate is
+    verified with a one-frame test encode (once per process).
+    """
+    import subprocess
+    available = ffmpeg_capabilities(ffmpeg_binary, "-encoders")
+    for encoder in ("h264_nvenc", "h264_qsv", "h264_videotoolbox"):
+        if encoder not in available:
+            continue
+        try:
+            result = subprocess.run(
+                [
+                    ffmpeg_binary, "-hide_banner", "-v", "error",
+                    "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.1",
+                    "-frames:v", "1", "-c:v", encoder, "-f", "null", "-"
+                ],
+                capture_output=True, timeout=30
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            return encoder
+    return "libx264"
+
 
 @lru_cache()
 def get_settings() -> Settings:
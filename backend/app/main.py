@@ -1,4 +1,6 @@
 """FastAPI main application."""
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,6 +12,14 @@ from app.database import init_db
 
 settings = get_settings()
 
+# Root logging at INFO so module loggers (e.g. subtitle_service) are emitted;
+# DEBUG only raises the app's own loggers, not third-party libraries
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logging.getLogger("app").setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,6 +28,11 @@ async def lifespan(app: FastAPI):
     # Initialize database
     init_db()
     
+    # Probe FFmpeg encoders/filters once, off the event loop, so requests
+    # never block on the cached subprocess checks
+    await asyncio.to_thread(settings.warm_ffmpeg_probes)
+    print(f"🎬 Video encoder: {settings.video_encoder}")
+    
     # Connect to Redis
     await cache_service.connect()
     print("✅ Connected to Redis")
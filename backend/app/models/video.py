@@ -1,5 +1,5 @@
 """Pydantic models for video data."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -17,7 +17,8 @@ class VideoStatus(str, Enum):
 
 
 class SubtitleStyle(BaseModel):
-    """Subtitle styling configuration."""
+    """Subtitle styling configuration (immutable, so segments can share one)."""
+    model_config = ConfigDict(frozen=True)
     font_family: str = "Arial"
     font_size: int = 24
     font_color: str = "#FFFFFF"
@@ -45,6 +46,8 @@ class VideoMetadata(BaseModel):
     fps: float
     file_size: int  # bytes
     format: str
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None  # None when the file has no audio
 
 
 class Video(BaseModel):
@@ -55,6 +58,7 @@ class Video(BaseModel):
     status: VideoStatus = VideoStatus.UPLOADED
     metadata: Optional[VideoMetadata] = None
     subtitles: List[SubtitleSegment] = []
+    language: Optional[str] = None  # Language of the current subtitles
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     exported_path: Optional[str] = None
@@ -72,6 +76,8 @@ class VideoExportRequest(BaseModel):
     """Request for video export."""
     burn_subtitles: bool = True
     output_format: str = "mp4"
+    trim_silence: bool = False  # Cut silences in the same encode
+    to_landscape: bool = False  # Letterbox portrait video to 1920x1080 in the same encode
 
 
 class VideoExportResponse(BaseModel):
@@ -87,6 +93,7 @@ class TrimSilenceRequest(BaseModel):
     silence_threshold: float = -40  # dB
     min_silence_duration: float = 0.5  # seconds
     padding: float = 0.1  # seconds to keep around speech
+    stream_copy: bool = False  # Cut without re-encoding (much faster, keyframe-accurate only)
 
 
 class TrimSilenceResponse(BaseModel):
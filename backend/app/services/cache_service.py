@@ -61,6 +61,29 @@ class CacheService:
                     return value
         return None
     
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values from cache in one round-trip (Redis MGET)."""
+        if not keys:
+            return []
+        
+        if self.use_memory:
+            values = [_memory_store.get(key) for key in keys]
+        else:
+            await self.connect()
+            if not self.redis:
+                return [None] * len(keys)
+            values = await self.redis.mget(keys)
+        
+        results = []
+        for value in values:
+            if value and isinstance(value, str):
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+            results.append(value)
+        return results
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache."""
         if ttl is None:
@@ -105,6 +128,10 @@ class CacheService:
         """Get video data from cache."""
         return await self.get(f"video:{video_id}")
     
+    async def get_videos(self, video_ids: List[str]) -> List[Optional[dict]]:
+        """Get data for several videos at once (None for missing ones)."""
+        return await self.get_many([f"video:{vid}" for vid in video_ids])
+    
     async def set_video(self, video_id: str, video_data: dict) -> bool:
         """Set video data in cache."""
         return await self.set(f"video:{video_id}", video_data)
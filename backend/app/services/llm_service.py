@@ -1,8 +1,10 @@
 """LLM orchestration service using LangGraph with Groq/OpenAI support."""
 import json
 import re
+from collections import defaultdict
 from typing import List, Dict, Any, Optional, TypedDict
 from datetime import datetime
+from pydantic import ValidationError
 
 from app.config import get_settings
 from app.models.video import SubtitleSegment, SubtitleStyle
@@ -313,13 +315,16 @@ Examples:
         if result.get("translate_to") or (response_text and response_text.startswith("TRANSLATE:")):
             target_lang = result.get("translate_to") or response_text.split(":")[1]
             from app.services.subtitle_service import subtitle_service
-            translated = await subtitle_service.translate_subtitles(current_subtitles, target_lang)
-            
-            # Update video with translated subtitles
             from app.services.video_service import video_service
             video = await video_service.get_video(video_id)
-            if video:
+            translated = await subtitle_service.translate_subtitles(
+                current_subtitles, target_lang, video.language if video else None
+            )
+            
+            # Update video with translated subtitles (only relabel if they changed)
+            if video and translated is not current_subtitles:
                 video.subtitles = translated
+                video.language = target_lang
                 await video_service.update_video(video)
             
             response_text = f"✅ Translated all subtitles to {target_lang}!"
@@ -343,16 +348,15 @@ Examples:
                 video_id=video_id
             )
         
-        # Apply edits to subtitles
+        # Group style edits by segment so each segment's style is rebuilt once
+        style_changes_by_segment = defaultdict(dict)
         for edit in pending_edits:
             action = edit.get("action")
             segment_index = edit.get("segment_index")
             
             if action == "style" and segment_index is not None:
                 if 0 <= segment_index < len(subtitles_dict):
-                    style_changes = edit.get("style_changes", {})
-                    subtitles_dict[segment_index]["style"].update(style_changes)
-
+                    style_changes_by_segment[segment_index].update(edit.get("style_changes") or {})
         
         # Convert edits to SubtitleEdit objects
         edits = []
@@ -371,10 +375,17 @@ Examples:
         from app.services.video_service import video_service
         video = await video_service.get_video(video_id)
         if video:
-            for i, sub_dict in enumerate(subtitles_dict):
+            for i, style_changes in style_changes_by_segment.items():
                 if i < len(video.subtitles):
-                    for key, value in sub_dict.get("style", {}).items():
-                        setattr(video.subtitles[i].style, key, value)
+                    # Ignore keys the LLM invented that aren't style fields
+                    update = {k: v for k, v in style_changes.items() if k in SubtitleStyle.model_fields}
+                    try:
+                        # Validate so a bad value (e.g. font_size "huge") can't reach the renderer
+                        video.subtitles[i].style = SubtitleStyle.model_validate(
+                            {**video.subtitles[i].style.model_dump(), **update}
+                        )
+                    except ValidationError:
+                        continue
             await video_service.update_video(video)
         
         # Store chat messages
@@ -1,5 +1,6 @@
 """Cloudflare R2 Storage Service - S3-compatible object storage."""
 import os
+import logging
 import boto3
 from botocore.config import Config
 from typing import Optional, BinaryIO
@@ -8,6 +9,7 @@ from pathlib import Path
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 class R2StorageService:
@@ -30,11 +32,11 @@ class R2StorageService:
                 region_name='auto'
             )
             self.bucket = settings.R2_BUCKET_NAME or "subtitle-ai-videos"
-            print(f"✅ R2 Storage connected to bucket: {self.bucket}")
+            logger.info("✅ R2 Storage connected to bucket: %s", self.bucket)
         else:
             self.client = None
             self.bucket = None
-            print("⚠️ R2 Storage not configured - using local storage")
+            logger.warning("⚠️ R2 Storage not configured - using local storage")
     
     async def upload_file(
         self,
@@ -59,11 +61,11 @@ class R2StorageService:
             
             # Return the public URL (if public bucket) or the key
             public_url = f"https://{settings.R2_PUBLIC_DOMAIN}/{storage_key}" if settings.R2_PUBLIC_DOMAIN else storage_key
-            print(f"✅ Uploaded to R2: {storage_key}")
+            logger.info("✅ Uploaded to R2: %s", storage_key)
             return public_url
             
         except Exception as e:
-            print(f"❌ R2 upload error: {e}")
+            logger.error("❌ R2 upload error: %s", e)
             return None
     
     async def upload_bytes(
@@ -88,11 +90,11 @@ class R2StorageService:
             )
             
             public_url = f"https://{settings.R2_PUBLIC_DOMAIN}/{storage_key}" if settings.R2_PUBLIC_DOMAIN else storage_key
-            print(f"✅ Uploaded to R2: {storage_key}")
+            logger.info("✅ Uploaded to R2: %s", storage_key)
             return public_url
             
         except Exception as e:
-            print(f"❌ R2 upload error: {e}")
+            logger.error("❌ R2 upload error: %s", e)
             return None
     
     async def download_file(self, storage_key: str, dest_path: str) -> bool:
@@ -102,10 +104,10 @@ class R2StorageService:
         
         try:
             self.client.download_file(self.bucket, storage_key, dest_path)
-            print(f"✅ Downloaded from R2: {storage_key}")
+            logger.info("✅ Downloaded from R2: %s", storage_key)
             return True
         except Exception as e:
-            print(f"❌ R2 download error: {e}")
+            logger.error("❌ R2 download error: %s", e)
             return False
     
     async def delete_file(self, storage_key: str) -> bool:
@@ -115,10 +117,10 @@ class R2StorageService:
         
         try:
             self.client.delete_object(Bucket=self.bucket, Key=storage_key)
-            print(f"✅ Deleted from R2: {storage_key}")
+            logger.info("✅ Deleted from R2: %s", storage_key)
             return True
         except Exception as e:
-            print(f"❌ R2 delete error: {e}")
+            logger.error("❌ R2 delete error: %s", e)
             return False
     
     def get_presigned_url(self, storage_key: str, expires_in: int = 3600) -> Optional[str]:
@@ -134,7 +136,7 @@ class R2StorageService:
             )
             return url
         except Exception as e:
-            print(f"❌ Presigned URL error: {e}")
+            logger.error("❌ Presigned URL error: %s", e)
             return None
 
 
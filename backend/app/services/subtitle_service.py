@@ -1,13 +1,47 @@
 """Subtitle generation service using Groq Whisper (whisper-large-v3)."""
-import os
+import logging
+import re
 import subprocess
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from app.config import get_settings
 from app.models.video import SubtitleSegment, SubtitleStyle
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Sentence/word splitters for the no-segments fallback path
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_WORD_SPLIT = re.compile(r'\s+')
+
+# "12. translated text" lines in the LLM translation response
+_NUMBERED_LINE = re.compile(r'^[ \t]*(\d+)\.[ \t]*(\S.*?)\s*$', re.MULTILINE)
+
+# Shared Groq client so transcription and translation reuse pooled connections
+_groq_client = None
+
+
+def _get_groq_client():
+    """Get the shared Groq client, created on first use."""
+    global _groq_client
+    if _groq_client is None:
+        import httpx
+        from groq import Groq
+        
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        
+        http_client = httpx.Client(
+            http2=http2,
+            timeout=httpx.Timeout(600.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+        )
+        _groq_client = Groq(api_key=settings.GROQ_API_KEY, http_client=http_client)
+    return _groq_client
 
 
 class SubtitleService:
@@ -19,54 +53,49 @@ class SubtitleService:
         video_id: str,
         default_style: Optional[SubtitleStyle] = None,
         language: str = "en"
-    ) -> List[SubtitleSegment]:
-        """Generate subtitles from video using Groq Whisper."""
-        import json as json_lib
+    ) -> Tuple[List[SubtitleSegment], str]:
+        """Generate subtitles from video using Groq Whisper.
         
+        Returns the subtitles and the language they are actually in: the
+        English mock subtitles used as a fallback report "en".
+        """
         if default_style is None:
             default_style = SubtitleStyle()
         
         # Get video duration first
-        video_duration = 30.0
-        try:
-            cmd = [
-                settings.ffprobe_binary,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                data = json_lib.loads(result.stdout)
-                video_duration = float(data.get("format", {}).get("duration", 30))
-                print(f"📎 Video duration: {video_duration:.1f}s")
-        except Exception as e:
-            print(f"⚠️ Could not get duration: {e}")
+        video_duration = self._probe_duration(video_path)
+        if video_duration is None:
+            video_duration = 30.0
+        else:
+            logger.info("📎 Video duration: %.1fs", video_duration)
         
-        # Extract audio from video
-        audio_path = settings.TEMP_DIR / f"{video_id}_audio.mp3"
+        # Extract audio from video (Opus in Ogg when available, MP3 otherwise)
+        if settings.has_libopus:
+            audio_path = settings.TEMP_DIR / f"{video_id}_audio.ogg"
+            codec_args = ["-c:a", "libopus", "-b:a", "16k", "-f", "ogg"]
+        else:
+            audio_path = settings.TEMP_DIR / f"{video_id}_audio.mp3"
+            codec_args = ["-c:a", "libmp3lame", "-b:a", "64k"]
         
         try:
             extract_cmd = [
                 settings.ffmpeg_binary, "-y",
                 "-i", video_path,
                 "-vn",
-                "-acodec", "libmp3lame",
                 "-ar", "16000",
                 "-ac", "1",
-                "-b:a", "64k",
+                *codec_args,
                 str(audio_path)
             ]
             
             result = subprocess.run(extract_cmd, capture_output=True, text=True)
             if result.returncode != 0:
-                print(f"Audio extraction failed: {result.stderr}")
-                return self._generate_mock_subtitles(video_path, default_style)
+                logger.error("Audio extraction failed: %s", result.stderr)
+                return self._generate_mock_subtitles(video_path, default_style), "en"
                 
         except Exception as e:
-            print(f"Audio extraction error: {e}")
-            return self._generate_mock_subtitles(video_path, default_style)
+            logger.error("Audio extraction error: %s", e)
+            return self._generate_mock_subtitles(video_path, default_style), "en"
         
         # Use Groq Whisper API (whisper-large-v3)
         if settings.GROQ_API_KEY:
@@ -74,24 +103,38 @@ class SubtitleService:
                 subtitles = await self._generate_with_groq(str(audio_path), default_style, video_duration, language)
                 self._cleanup_audio(audio_path)
                 if subtitles:
-                    return subtitles
+                    return subtitles, language
             except Exception as e:
-                print(f"Groq transcription error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Groq transcription error: %s", e)
                 self._cleanup_audio(audio_path)
         
         # Fallback to mock
         self._cleanup_audio(audio_path)
-        return self._generate_mock_subtitles(video_path, default_style)
+        return self._generate_mock_subtitles(video_path, default_style), "en"
+    
+    def _probe_duration(self, video_path: str) -> Optional[float]:
+        """Get container duration in seconds via FFprobe (None on failure)."""
+        cmd = [
+            settings.ffprobe_binary,
+            "-v", "quiet",
+            "-show_entries", "format=duration",
+            "-of", "csv=p=0",
+            video_path
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+            if result.returncode == 0:
+                return float(result.stdout)
+        except (OSError, ValueError) as e:
+            logger.warning("⚠️ Could not get duration: %s", e)
+        return None
     
     def _cleanup_audio(self, audio_path: Path):
         """Clean up temporary audio file."""
         try:
-            if audio_path.exists():
-                os.remove(audio_path)
-        except:
-            pass
+            audio_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning("⚠️ Could not remove %s: %s", audio_path, e)
     
     async def _generate_with_groq(
         self,
@@ -101,13 +144,10 @@ class SubtitleService:
         language: str = "en"
     ) -> List[SubtitleSegment]:
         """Generate subtitles using Groq Whisper API (whisper-large-v3)."""
-        from groq import Groq
-        import re
-        
-        client = Groq(api_key=settings.GROQ_API_KEY)
+        client = _get_groq_client()
         
-        print(f"🎤 Transcribing with Groq whisper-large-v3 (Language: {language})...")
-        print(f"📊 Video duration: {video_duration:.1f}s")
+        logger.info("🎤 Transcribing with Groq whisper-large-v3 (Language: %s)...", language)
+        logger.info("📊 Video duration: %.1fs", video_duration)
         
         try:
             # Use specified language
@@ -119,63 +159,62 @@ class SubtitleService:
                     language=language  # Use requested language
                 )
             
-            print(f"📊 Response received. Text length: {len(response.text) if hasattr(response, 'text') else 0}")
+            logger.info("📊 Response received. Text length: %d", len(response.text) if hasattr(response, 'text') else 0)
             
             subtitles = []
             
             # Check if we have segments
             segments = getattr(response, 'segments', None)
-            print(f"📊 Segments available: {segments is not None}")
-            print(f"📊 Segments count: {len(segments) if segments else 0}")
+            logger.debug("📊 Segments count: %d", len(segments) if segments else 0)
             
             if segments and len(segments) > 0:
-                print(f"📝 Processing {len(segments)} segments from Whisper...")
+                logger.info("📝 Processing %d segments from Whisper...", len(segments))
                 
-                for i, segment in enumerate(segments):
-                    # Handle both dict and object
-                    if isinstance(segment, dict):
-                        start = float(segment.get('start', 0))
-                        end = float(segment.get('end', 0))
-                        text = segment.get('text', '').strip()
-                    else:
-                        start = float(getattr(segment, 'start', 0))
-                        end = float(getattr(segment, 'end', 0))
-                        text = getattr(segment, 'text', '').strip()
-                    
-                    if text:
-                        print(f"   ✓ Segment {i}: {start:.1f}s-{end:.1f}s: {text[:40]}...")
-                        subtitle = SubtitleSegment(
-                            start_time=start,
-                            end_time=end,
-                            text=text,
-                            style=default_style.model_copy()
+                # Handle both dict and object segments (decided once, not per segment)
+                if isinstance(segments[0], dict):
+                    def fields(segment):
+                        return (
+                            float(segment.get('start', 0)),
+                            float(segment.get('end', 0)),
+                            segment.get('text', '').strip()
+                        )
+                else:
+                    def fields(segment):
+                        return (
+                            float(getattr(segment, 'start', 0)),
+                            float(getattr(segment, 'end', 0)),
+                            getattr(segment, 'text', '').strip()
                         )
-                        subtitles.append(subtitle)
+                
+                subtitles = [
+                    SubtitleSegment(start_time=start, end_time=end, text=text, style=default_style)
+                    for start, end, text in map(fields, segments)
+                    if text
+                ]
             
             else:
                 # Fallback: No segments, create from full text
                 full_text = (response.text if hasattr(response, 'text') else "").strip()
-                print(f"⚠️ No segments, creating from full text ({len(full_text)} chars)")
+                logger.warning("⚠️ No segments, creating from full text (%d chars)", len(full_text))
                 
                 if full_text:
                     # Split into sentences/phrases
-                    chunks = re.split(r'(?<=[.!?])\s+', full_text)
+                    chunks = _SENT_SPLIT.split(full_text)
+                    words = _WORD_SPLIT.split(full_text)
                     
                     # If still one chunk, split by commas or every 8 words
                     if len(chunks) <= 1:
-                        words = full_text.split()
                         chunks = []
-                        current = []
-                        for word in words:
-                            current.append(word)
-                            if len(current) >= 6 or word.endswith(','):
-                                chunks.append(' '.join(current).strip().rstrip(','))
-                                current = []
-                        if current:
-                            chunks.append(' '.join(current).strip())
+                        chunk_start = 0
+                        for end, word in enumerate(words, 1):
+                            if end - chunk_start >= 6 or word.endswith(','):
+                                chunks.append(' '.join(words[chunk_start:end]).rstrip(','))
+                                chunk_start = end
+                        if chunk_start < len(words):
+                            chunks.append(' '.join(words[chunk_start:]))
                     
                     # Calculate timing based on actual video duration
-                    total_words = len(full_text.split())
+                    total_words = len(words)
                     if total_words > 0:
                         seconds_per_word = video_duration / total_words
                     else:
@@ -198,19 +237,17 @@ class SubtitleService:
                                 start_time=current_time,
                                 end_time=current_time + duration,
                                 text=chunk,
-                                style=default_style.model_copy()
+                                style=default_style
                             )
                             subtitles.append(subtitle)
-                            print(f"   Created: {current_time:.1f}s-{current_time+duration:.1f}s: {chunk[:30]}...")
+                            logger.debug("Created: %.1fs-%.1fs: %.30s", current_time, current_time + duration, chunk)
                             current_time += duration + 0.3
             
-            print(f"✅ Generated {len(subtitles)} subtitle segments")
+            logger.info("✅ Generated %d subtitle segments", len(subtitles))
             return subtitles
             
         except Exception as e:
-            print(f"❌ Groq error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Groq error: %s", e)
             return []
     
     def _generate_mock_subtitles(
@@ -219,56 +256,36 @@ class SubtitleService:
         default_style: SubtitleStyle
     ) -> List[SubtitleSegment]:
         """Generate mock subtitles for demo."""
-        import json as json_lib
+        duration = self._probe_duration(video_path) or 30.0
         
-        # Get video duration
-        try:
-            cmd = [
-                settings.ffprobe_binary,
-                "-v", "quiet",
-                "-print_format", "json",
-                "-show_format",
-                video_path
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            data = json_lib.loads(result.stdout)
-            duration = float(data.get("format", {}).get("duration", 30))
-        except:
-            duration = 30.0
-        
-        print(f"⚠️ Using mock subtitles (duration: {duration:.1f}s)")
+        logger.warning("⚠️ Using mock subtitles (duration: %.1fs)", duration)
         
         subtitles = []
+        style = default_style.model_copy(update={"font_size": 24})
         
         # First segment
-        style1 = default_style.model_copy()
-        style1.font_size = 24
         subtitles.append(SubtitleSegment(
             start_time=1.0,
             end_time=min(duration * 0.3, 8.0),
             text="This is the first subtitle segment.",
-            style=style1
+            style=style
         ))
         
         # Second segment
-        style2 = default_style.model_copy()
-        style2.font_size = 24
         subtitles.append(SubtitleSegment(
             start_time=max(duration * 0.35, 3.0),
             end_time=min(duration * 0.6, 15.0),
             text="This is the second subtitle segment.",
-            style=style2
+            style=style
         ))
         
         # Third segment
         if duration > 10:
-            style3 = default_style.model_copy()
-            style3.font_size = 24
             subtitles.append(SubtitleSegment(
                 start_time=max(duration * 0.65, 8.0),
                 end_time=duration - 1.0,
                 text="This is the third subtitle segment.",
-                style=style3
+                style=style
             ))
         
         return subtitles
@@ -292,27 +309,40 @@ class SubtitleService:
         if not subtitles:
             return "No subtitles generated yet."
         
-        lines = []
-        for i, sub in enumerate(subtitles, 1):
-            time_range = f"{sub.start_time:.1f}s - {sub.end_time:.1f}s"
-            style_info = f"(size: {sub.style.font_size}px, color: {sub.style.font_color})"
-            lines.append(f"{i}. [{time_range}] \"{sub.text}\" {style_info}")
+        def lines():
+            for i, sub in enumerate(subtitles, 1):
+                style = sub.style
+                yield (
+                    f"{i}. [{sub.start_time:.1f}s - {sub.end_time:.1f}s] \"{sub.text}\" "
+                    f"(size: {style.font_size}px, color: {style.font_color})"
+                )
         
-        return "\n".join(lines)
+        return "\n".join(lines())
     
     async def translate_subtitles(
         self,
         subtitles: List[SubtitleSegment],
-        target_language: str = "Hindi"
+        target_language: str = "Hindi",
+        source_language: Optional[str] = None
     ) -> List[SubtitleSegment]:
-        """Translate subtitles to another language using Groq LLM."""
+        """Translate subtitles to another language using Groq LLM.
+        
+        Returns the `subtitles` list itself (same object) when nothing was translated.
+        """
+        if not subtitles:
+            return subtitles
+        
+        # Nothing to do if the subtitles are already in the target language
+        if source_language and language_code(source_language) == language_code(target_language):
+            logger.info("Subtitles already in %s, skipping translation", target_language)
+            return subtitles
+        
         if not settings.GROQ_API_KEY:
-            print("⚠️ No Groq API key for translation")
+            logger.warning("⚠️ No Groq API key for translation")
             return subtitles
         
         try:
-            from groq import Groq
-            client = Groq(api_key=settings.GROQ_API_KEY)
+            client = _get_groq_client()
             
             # Batch translate for efficiency and context
             all_texts = [sub.text for sub in subtitles]
@@ -347,22 +377,17 @@ Example format:
             
             translated_content = response.choices[0].message.content.strip()
             
-            # Parse the numbered translations
-            translated_texts = []
-            for line in translated_content.split("\n"):
-                line = line.strip()
-                if line and line[0].isdigit():
-                    # Remove the number prefix (e.g., "1. ", "2. ")
-                    parts = line.split(". ", 1)
-                    if len(parts) > 1:
-                        translated_texts.append(parts[1])
-                    else:
-                        translated_texts.append(line)
+            # Parse the numbered translations by their number, not their position,
+            # so a skipped, merged or blank line can't shift later subtitles
+            translated_texts = {
+                int(number) - 1: text
+                for number, text in _NUMBERED_LINE.findall(translated_content)
+            }
             
             # Create translated subtitles
             translated_subtitles = []
             for i, sub in enumerate(subtitles):
-                text = translated_texts[i] if i < len(translated_texts) else sub.text
+                text = translated_texts.get(i, sub.text)
                 new_sub = SubtitleSegment(
                     id=sub.id,
                     start_time=sub.start_time,
@@ -372,11 +397,11 @@ Example format:
                 )
                 translated_subtitles.append(new_sub)
             
-            print(f"✅ Translated {len(translated_subtitles)} subtitles to {target_language}")
+            logger.info("✅ Translated %d subtitles to %s", len(translated_subtitles), target_language)
             return translated_subtitles
             
         except Exception as e:
-            print(f"Translation error: {e}")
+            logger.error("Translation error: %s", e)
             return subtitles
 
 
@@ -387,6 +412,20 @@ SUPPORTED_LANGUAGES = [
     "Arabic", "Tamil", "Telugu", "Bengali", "Marathi"
 ]
 
+# Language name -> Whisper/ISO 639-1 code
+LANGUAGE_CODES = {
+    "english": "en", "hindi": "hi", "spanish": "es", "french": "fr",
+    "german": "de", "chinese": "zh", "japanese": "ja", "korean": "ko",
+    "portuguese": "pt", "italian": "it", "russian": "ru", "arabic": "ar",
+    "tamil": "ta", "telugu": "te", "bengali": "bn", "marathi": "mr"
+}
+
+
+def language_code(language: str) -> str:
+    """Normalize a language name or code (e.g. "Hindi", "hi") to its code."""
+    language = language.strip().lower()
+    return LANGUAGE_CODES.get(language, language)
+
 
 # Singleton instance
 subtitle_service = SubtitleService()
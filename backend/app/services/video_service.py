@@ -1,39 +1,248 @@
-"""Video processing service using FFmpeg and MoviePy."""
+"""Video processing service using FFmpeg."""
+import asyncio
 import os
+import shutil
 import uuid
 import subprocess
-import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, BinaryIO
 # Removed MoviePy imports to avoid dependency issues on Windows without C++ tools
 # Using pure FFmpeg for operations
 
+try:
+    import orjson as json_lib  # Faster, and parses bytes without decoding first
+except ImportError:
+    import json as json_lib
+
 
 from app.config import get_settings
 from app.models.video import (
     Video, VideoStatus, VideoMetadata, SubtitleSegment, SubtitleStyle
 )
 from app.services.cache_service import cache_service
+from app.subtitle_render import render_subtitle_png
 
 settings = get_settings()
 
 
+class UploadTooLargeError(ValueError):
+    """An upload exceeded the allowed size."""
+
+
+# Below this many distinct subtitle texts, rendering inline beats
+# dispatching to worker processes
+_INLINE_RENDER_MAX = 16
+
+
+@lru_cache(maxsize=1)
+def _render_pool() -> ProcessPoolExecutor:
+    """Process pool for subtitle PNG rendering, started on first use and kept."""
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
+def _render_subtitle_pngs(texts: List[str], video_w: int, video_h: int, png_paths: dict) -> List[int]:
+    """Render a batch of subtitle PNGs in this process; returns their heights."""
+    return [
+        render_subtitle_png(text, video_w, video_h, str(png_paths[text]))
+        for text in texts
+    ]
+
+
+@lru_cache(maxsize=1)
+def _clip_rng():
+    """Process-wide PCG64 generator for viral clip sampling (numpy imported on first use)."""
+    import numpy as np
+    return np.random.default_rng()
+
+
+def _video_encoder_args(preset: str = "fast") -> List[str]:
+    """FFmpeg video codec args for the configured encoder at ~CRF 23 quality.
+    
+    `preset` is the libx264 preset; hardware encoders use their own fast preset.
+    """
+    encoder = settings.video_encoder
+    if encoder == "h264_nvenc":
+        return ["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "23"]
+    if encoder == "h264_qsv":
+        return ["-c:v", "h264_qsv", "-preset", "veryfast", "-global_quality", "23"]
+    if encoder == "h264_videotoolbox":
+        return ["-c:v", "h264_videotoolbox", "-b:v", "6M"]
+    return ["-c:v", "libx264", "-preset", preset, "-crf", "23", "-threads", "0"]
+
+
+# Codecs that can be stream-copied into an MP4 container as-is
+_MP4_VIDEO_CODECS = {"h264", "hevc", "mpeg4", "av1"}
+_MP4_AUDIO_CODECS = {"aac", "mp3"}
+
+
+def _audio_codec_args(metadata: Optional[VideoMetadata]) -> List[str]:
+    """Copy MP4-compatible audio straight into the output, otherwise encode AAC 128k."""
+    if metadata and metadata.audio_codec in _MP4_AUDIO_CODECS:
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac", "-b:a", "128k"]
+
+
+# ffprobe's format_name for the MP4 files this service writes
+_MP4_FORMAT_NAME = "mov,mp4,m4a,3gp,3g2,mj2"
+
+
+def _mark_encoded_mp4(metadata: VideoMetadata, copied_audio: bool):
+    """Describe a freshly encoded H.264 MP4 in metadata without re-probing.
+    
+    `copied_audio` means the audio args came from _audio_codec_args, which
+    keeps MP4-compatible audio as-is; any other audio track is now AAC.
+    """
+    metadata.video_codec = "h264"
+    metadata.format = _MP4_FORMAT_NAME
+    if metadata.audio_codec and not (copied_audio and metadata.audio_codec in _MP4_AUDIO_CODECS):
+        metadata.audio_codec = "aac"
+
+
+def _can_remux_to_mp4(metadata: Optional[VideoMetadata]) -> bool:
+    """True when every stream can be copied into an MP4 without re-encoding.
+    
+    Metadata cached before codecs were probed has video_codec None, so it
+    is treated as unknown and re-encoded.
+    """
+    return bool(
+        metadata
+        and metadata.video_codec in _MP4_VIDEO_CODECS
+        and (metadata.audio_codec is None or metadata.audio_codec in _MP4_AUDIO_CODECS)
+    )
+
+
+async def _run_process(
+    cmd: List[str],
+    check: bool = True,
+    cwd: Optional[Path] = None,
+    capture_stdout: bool = True
+) -> Tuple[Optional[bytes], bytes]:
+    """Run a subprocess without blocking the event loop; returns (stdout, stderr).
+    
+    Pass `capture_stdout=False` for commands that write to a file, so stdout
+    goes to /dev/null; stderr is always kept for error reporting.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE if capture_stdout else asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd
+    )
+    stdout, stderr = await proc.communicate()
+    if check and proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    return stdout, stderr
+
+
+# Each libx264 encode already uses every core, so running many at once only
+# thrashes; cap concurrent encodes and let the rest queue
+_ENCODE_SLOTS = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+
+
+async def _run_encode(cmd: List[str], cwd: Optional[Path] = None):
+    """Run an FFmpeg command that writes a file, waiting for a free encode slot."""
+    async with _ENCODE_SLOTS:
+        await _run_process(cmd, cwd=cwd, capture_stdout=False)
+
+
+class _PcmSilenceDetector:
+    """Streaming silence detector over signed 16-bit mono PCM.
+    
+    Samples are grouped into 10 ms windows; a window is silent when its RMS is
+    below the dB threshold, and runs of silent windows at least
+    `min_duration` long are reported as (start, end) seconds.
+    """
+    
+    SAMPLE_RATE = 16000
+    WINDOW = 160  # samples (10 ms)
+    
+    def __init__(self, threshold_db: float, min_duration: float):
+        # Compare mean squares against the squared amplitude threshold (no sqrt/log)
+        self.threshold_sq = (32768.0 * 10 ** (threshold_db / 20)) ** 2
+        self.min_windows = min_duration * self.SAMPLE_RATE / self.WINDOW
+        self.pending = b""
+        self.windows_seen = 0
+        self.run_start = None
+        self.segments: List[Tuple[float, float]] = []
+    
+    def feed(self, data: bytes):
+        import numpy as np
+        
+        data = self.pending + data
+        usable = len(data) - len(data) % (self.WINDOW * 2)
+        self.pending = data[usable:]
+        if not usable:
+            return
+        
+        samples = np.frombuffer(data, dtype=np.int16, count=usable // 2).astype(np.float32)
+        mean_sq = np.mean(np.square(samples.reshape(-1, self.WINDOW)), axis=1)
+        below = mean_sq < self.threshold_sq
+        
+        # Edges of silent runs, seeded with whether a run is already open
+        flags = np.empty(len(below) + 1, dtype=np.int8)
+        flags[0] = self.run_start is not None
+        flags[1:] = below
+        edges = np.diff(flags)
+        starts = np.flatnonzero(edges == 1) + self.windows_seen
+        ends = np.flatnonzero(edges == -1) + self.windows_seen
+        
+        if self.run_start is not None and len(ends):
+            self._close(self.run_start, ends[0])
+            self.run_start = None
+            ends = ends[1:]
+        for i, start in enumerate(starts):
+            if i < len(ends):
+                self._close(start, ends[i])
+            else:
+                self.run_start = int(start)
+        
+        self.windows_seen += len(below)
+    
+    def finish(self) -> List[Tuple[float, float]]:
+        if self.run_start is not None:
+            self._close(self.run_start, self.windows_seen)
+            self.run_start = None
+        return self.segments
+    
+    def _close(self, start: int, end: int):
+        if end - start >= self.min_windows:
+            scale = self.WINDOW / self.SAMPLE_RATE
+            self.segments.append((round(int(start) * scale, 3), round(int(end) * scale, 3)))
+
+
+# ffprobe results are keyed by path + size + mtime, so a changed file never hits
+FFPROBE_CACHE_TTL = 14 * 24 * 3600  # 2 weeks
+METADATA_LRU_SIZE = 128  # In-process entries kept in front of the shared cache
+
+
 class VideoService:
     """Service for video processing operations."""
     
-    async def save_uploaded_video(self, file_content: bytes, filename: str) -> Video:
-        """Save uploaded video and create video record.
-        Automatically converts portrait videos to landscape format.
+    def __init__(self):
+        # ffprobe cache key -> metadata, most recently used last
+        self._metadata_lru: "OrderedDict[str, VideoMetadata]" = OrderedDict()
+    
+    async def save_uploaded_video(
+        self,
+        file_stream: BinaryIO,
+        filename: str,
+        max_size: Optional[int] = None
+    ) -> Video:
+        """Stream an uploaded video to disk and create the video record.
+        
+        Raises UploadTooLargeError if the upload is larger than `max_size` bytes.
         """
         video_id = str(uuid.uuid4())
         extension = Path(filename).suffix.lower()
         
-        # Save file
+        # Save file in chunks so memory use doesn't grow with the upload size
         saved_filename = f"{video_id}{extension}"
         file_path = settings.UPLOAD_DIR / saved_filename
         
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        await asyncio.to_thread(self._write_upload, file_stream, file_path, max_size)
         
         # Get metadata
         metadata = await self.get_video_metadata(str(file_path))
@@ -59,25 +268,58 @@ class VideoService:
         
         return video
     
+    @staticmethod
+    def _write_upload(file_stream: BinaryIO, file_path: Path, max_size: Optional[int]):
+        """Copy an upload stream to disk in 1MB chunks, enforcing the size limit."""
+        written = 0
+        try:
+            with open(file_path, "wb") as f:
+                while chunk := file_stream.read(1 << 20):
+                    written += len(chunk)
+                    if max_size is not None and written > max_size:
+                        raise UploadTooLargeError("File too large")
+                    f.write(chunk)
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
+    
+    def _ffprobe_cache_key(self, file_path: str) -> Optional[str]:
+        """Cache key identifying this exact version of a file."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return f"ffprobe:{file_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    
     async def get_video_metadata(self, file_path: str) -> VideoMetadata:
-        """Extract video metadata using FFprobe."""
+        """Extract video metadata using FFprobe (cached per file version)."""
+        cache_key = self._ffprobe_cache_key(file_path)
+        if cache_key:
+            # Callers mutate the metadata they get back, so hand out copies
+            if cache_key in self._metadata_lru:
+                self._metadata_lru.move_to_end(cache_key)
+                return self._metadata_lru[cache_key].model_copy()
+            cached = await cache_service.get(cache_key)
+            if cached:
+                metadata = VideoMetadata(**cached)
+                self._remember_metadata(cache_key, metadata)
+                return metadata.model_copy()
+        
         cmd = [
             settings.ffprobe_binary,
             "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
+            "-print_format", "json=compact=1",
+            "-show_entries", "format=duration,size,format_name:stream=codec_type,codec_name,width,height,r_frame_rate",
             file_path
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
+            stdout, _ = await _run_process(cmd)
+            data = json_lib.loads(stdout)
             
-            video_stream = next(
-                (s for s in data.get("streams", []) if s.get("codec_type") == "video"),
-                {}
-            )
+            streams = data.get("streams", [])
+            video_stream = next((s for s in streams if s.get("codec_type") == "video"), {})
+            audio_stream = next((s for s in streams if s.get("codec_type") == "audio"), {})
             format_info = data.get("format", {})
             
             # Calculate FPS
@@ -85,19 +327,34 @@ class VideoService:
             fps_parts = fps_str.split("/")
             fps = float(fps_parts[0]) / float(fps_parts[1]) if len(fps_parts) == 2 else 30.0
             
-            return VideoMetadata(
+            metadata = VideoMetadata(
                 duration=float(format_info.get("duration", 0)),
                 width=int(video_stream.get("width", 0)),
                 height=int(video_stream.get("height", 0)),
                 fps=fps,
                 file_size=int(format_info.get("size", 0)),
-                format=format_info.get("format_name", "unknown")
+                format=format_info.get("format_name", "unknown"),
+                video_codec=video_stream.get("codec_name"),
+                audio_codec=audio_stream.get("codec_name")
             )
         except Exception as e:
             print(f"Error getting metadata: {e}")
             return VideoMetadata(
                 duration=0, width=0, height=0, fps=30.0, file_size=0, format="unknown"
             )
+        
+        if cache_key:
+            self._remember_metadata(cache_key, metadata)
+            await cache_service.set(cache_key, metadata.model_dump(), ttl=FFPROBE_CACHE_TTL)
+            return metadata.model_copy()
+        return metadata
+    
+    def _remember_metadata(self, cache_key: str, metadata: VideoMetadata):
+        """Store metadata in the in-process LRU, evicting the oldest entry when full."""
+        self._metadata_lru[cache_key] = metadata
+        self._metadata_lru.move_to_end(cache_key)
+        if len(self._metadata_lru) > METADATA_LRU_SIZE:
+            self._metadata_lru.popitem(last=False)
     
     async def get_video(self, video_id: str) -> Optional[Video]:
         """Get video by ID from cache."""
@@ -116,11 +373,11 @@ class VideoService:
     async def list_videos(self) -> List[Video]:
         """List all videos from cache."""
         video_ids = await cache_service.list_video_ids()
-        videos = []
-        for vid in video_ids:
-            video_data = await cache_service.get_video(vid)
-            if video_data:
-                videos.append(Video(**video_data))
+        videos = [
+            Video(**video_data)
+            for video_data in await cache_service.get_videos(video_ids)
+            if video_data
+        ]
         # Sort by updated_at descending
         videos.sort(key=lambda v: v.updated_at, reverse=True)
         return videos
@@ -135,21 +392,14 @@ class VideoService:
         if not video:
             return False
         
-        # Delete video file
-        video_path = self.get_video_path(video)
-        if video_path.exists():
-            video_path.unlink()
-        
-        # Delete exported file if exists
+        # Delete the video, exported and trimmed files (whichever exist) concurrently
+        paths = [
+            self.get_video_path(video),
+            settings.UPLOAD_DIR / f"{video_id}_trimmed.mp4"
+        ]
         if video.exported_path:
-            export_path = Path(video.exported_path)
-            if export_path.exists():
-                export_path.unlink()
-        
-        # Delete trimmed file if exists
-        trimmed_path = settings.UPLOAD_DIR / f"{video_id}_trimmed.mp4"
-        if trimmed_path.exists():
-            trimmed_path.unlink()
+            paths.append(Path(video.exported_path))
+        await asyncio.gather(*(asyncio.to_thread(p.unlink, missing_ok=True) for p in paths))
         
         # Remove from cache
         await cache_service.delete_video(video_id)
@@ -167,64 +417,51 @@ class VideoService:
         if not video:
             raise ValueError(f"Video {video_id} not found")
         
-        video_path = self.get_video_path(video)
+        return await self._detect_silence_in_file(
+            self.get_video_path(video), silence_threshold, min_silence_duration
+        )
+    
+    async def _detect_silence_in_file(
+        self,
+        video_path: Path,
+        silence_threshold: float,
+        min_silence_duration: float
+    ) -> List[Tuple[float, float]]:
+        """Detect silence in a file's audio track.
         
-        # Use FFmpeg to detect silence
+        Thresholds windowed RMS of 16 kHz mono PCM streamed from FFmpeg.
+        """
         cmd = [
             settings.ffmpeg_binary,
+            "-nostdin", "-v", "error",
             "-i", str(video_path),
-            "-af", f"silencedetect=noise={silence_threshold}dB:d={min_silence_duration}",
-            "-f", "null",
+            "-vn", "-sn", "-dn",
+            "-ac", "1", "-ar", str(_PcmSilenceDetector.SAMPLE_RATE),
+            "-f", "s16le",
             "-"
         ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        # Parse silence detection output
-        silent_segments = []
-        lines = result.stderr.split("\n")
-        start_time = None
-        
-        for line in lines:
-            if "silence_start:" in line:
-                try:
-                    start_time = float(line.split("silence_start:")[1].strip().split()[0])
-                except (IndexError, ValueError):
-                    pass
-            elif "silence_end:" in line and start_time is not None:
-                try:
-                    parts = line.split("silence_end:")[1].strip().split()
-                    end_time = float(parts[0])
-                    silent_segments.append((start_time, end_time))
-                    start_time = None
-                except (IndexError, ValueError):
-                    pass
-        
-        return silent_segments
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        detector = _PcmSilenceDetector(silence_threshold, min_silence_duration)
+        try:
+            while chunk := await proc.stdout.read(1 << 20):
+                detector.feed(chunk)
+            await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()  # Cancelled mid-stream
+        return detector.finish()
     
-    async def trim_silence(
+    def _keep_segments(
         self,
-        video_id: str,
-        silence_threshold: float = -40,
-        min_silence_duration: float = 0.5,
-        padding: float = 0.1
-    ) -> Tuple[float, float, int]:
-        """Trim silent portions from video using FFmpeg."""
-        video = await self.get_video(video_id)
-        if not video:
-            raise ValueError(f"Video {video_id} not found")
-        
-        video_path = self.get_video_path(video)
-        silent_segments = await self.detect_silence(
-            video_id, silence_threshold, min_silence_duration
-        )
-        
-        original_duration = video.metadata.duration
-        
-        if not silent_segments:
-            return original_duration, original_duration, 0
-            
-        # 1. Calculate Keep Segments
+        silent_segments: List[Tuple[float, float]],
+        duration: float,
+        padding: float
+    ) -> List[Tuple[float, float]]:
+        """Spans to keep between silences (padded), clamped to [0, duration]."""
         keep_segments = []
         current_time = 0.0
         
@@ -236,61 +473,147 @@ class VideoService:
             current_time = end - padding
         
         # Keep remaining
-        if current_time < original_duration:
-             keep_segments.append((current_time, original_duration))
-             
-        if not keep_segments:
-             return original_duration, original_duration, len(silent_segments)
-
-        # 2. Build FFmpeg Filter Complex
+        if current_time < duration:
+            keep_segments.append((current_time, duration))
+        
+        # Ensure boundaries are within duration
+        clamped = ((max(0, start), min(duration, end)) for start, end in keep_segments)
+        return [(start, end) for start, end in clamped if start < end]
+    
+    def _trim_filter(self, keep_segments: List[Tuple[float, float]]) -> List[str]:
+        """filter_complex parts cutting [0:v]/[0:a] down to keep_segments as [trimv]/[trima]."""
         # [0:v]trim=start=S:end=E,setpts=PTS-STARTPTS[v0];
         # [0:a]atrim=start=S:end=E,asetpts=PTS-STARTPTS[a0];
         filter_parts = []
-        concat_v = []
-        concat_a = []
-        
         for i, (start, end) in enumerate(keep_segments):
-            # Ensure boundaries are within duration
-            start = max(0, start)
-            end = min(original_duration, end)
-            if start >= end:
-                continue
-                
             filter_parts.append(f"[0:v]trim=start={start}:end={end},setpts=PTS-STARTPTS[v{i}]")
             filter_parts.append(f"[0:a]atrim=start={start}:end={end},asetpts=PTS-STARTPTS[a{i}]")
-            concat_v.append(f"[v{i}]")
-            concat_a.append(f"[a{i}]")
         
-        if not concat_v:
-             return original_duration, original_duration, len(silent_segments)
-
-        n = len(concat_v)
-        concat_str = f"{''.join(concat_v)}{''.join(concat_a)}concat=n={n}:v=1:a=1[outv][outa]"
-        filter_parts.append(concat_str)
-        filter_complex = ";".join(filter_parts)
+        # concat takes its inputs segment by segment: [v0][a0][v1][a1]...
+        concat_inputs = "".join(f"[v{i}][a{i}]" for i in range(len(keep_segments)))
+        filter_parts.append(f"{concat_inputs}concat=n={len(keep_segments)}:v=1:a=1[trimv][trima]")
+        return filter_parts
+    
+    def _retime_subtitles(
+        self,
+        subtitles: List[SubtitleSegment],
+        keep_segments: List[Tuple[float, float]]
+    ) -> List[SubtitleSegment]:
+        """Map subtitle times onto the timeline left after cutting to keep_segments."""
+        offsets = []
+        total = 0.0
+        for start, end in keep_segments:
+            offsets.append(total)
+            total += end - start
+        
+        def output_time(t: float) -> float:
+            for (start, end), offset in zip(keep_segments, offsets):
+                if t < start:
+                    return offset  # Inside a cut: snap to the next kept span
+                if t <= end:
+                    return offset + t - start
+            return total
+        
+        retimed = []
+        for sub in subtitles:
+            start, end = output_time(sub.start_time), output_time(sub.end_time)
+            if end > start:
+                retimed.append(sub.model_copy(update={"start_time": start, "end_time": end}))
+        return retimed
+    
+    async def trim_silence(
+        self,
+        video_id: str,
+        silence_threshold: float = -40,
+        min_silence_duration: float = 0.5,
+        padding: float = 0.1,
+        stream_copy: bool = False
+    ) -> Tuple[float, float, int]:
+        """Trim silent portions from video using FFmpeg.
+        
+        With `stream_copy`, the kept spans are joined by the concat demuxer
+        without re-encoding; much faster, but cuts snap to keyframes.
+        """
+        video = await self.get_video(video_id)
+        if not video:
+            raise ValueError(f"Video {video_id} not found")
+        
+        video_path = self.get_video_path(video)
+        original_duration = video.metadata.duration
+        silent_segments = await self._detect_silence_in_file(
+            video_path, silence_threshold, min_silence_duration
+        )
+        
+        if not silent_segments:
+            return original_duration, original_duration, 0
+        
+        keep_segments = self._keep_segments(silent_segments, original_duration, padding)
+        if not keep_segments:
+            return original_duration, original_duration, len(silent_segments)
+        
+        new_duration = sum(end - start for start, end in keep_segments)
         
         trimmed_filename = f"{video_id}_trimmed.mp4"
         trimmed_path = settings.UPLOAD_DIR / trimmed_filename
+        concat_list_path = settings.TEMP_DIR / f"{video_id}_trim.txt"
         
-        cmd = [
-            settings.ffmpeg_binary, "-y",
-            "-i", str(video_path),
-            "-filter_complex", filter_complex,
-            "-map", "[outv]", "-map", "[outa]",
-            "-c:v", "libx264", "-c:a", "aac",
-            str(trimmed_path)
-        ]
+        # Streams MP4 can't hold (e.g. VP8/Vorbis) must be re-encoded anyway
+        stream_copy = stream_copy and _can_remux_to_mp4(video.metadata)
+        
+        if stream_copy:
+            # One concat-demuxer pass over inpoint/outpoint spans of the source
+            quoted_path = str(video_path.resolve()).replace("'", "'\\''")
+            concat_list_path.write_text(
+                "".join(
+                    f"file '{quoted_path}'\ninpoint {start}\noutpoint {end}\n"
+                    for start, end in keep_segments
+                ),
+                encoding="utf-8"
+            )
+            cmd = [
+                settings.ffmpeg_binary, "-y",
+                "-nostdin", "-v", "error",
+                "-f", "concat", "-safe", "0",
+                "-i", str(concat_list_path),
+                "-c", "copy",
+                str(trimmed_path)
+            ]
+        else:
+            cmd = [
+                settings.ffmpeg_binary, "-y",
+                "-nostdin", "-v", "error",
+                "-i", str(video_path),
+                "-filter_complex", ";".join(self._trim_filter(keep_segments)),
+                "-map", "[trimv]", "-map", "[trima]",
+                *_video_encoder_args("medium"), "-c:a", "aac", "-b:a", "128k",
+                str(trimmed_path)
+            ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            await _run_encode(cmd)
             
-            # Get new duration
-            new_metadata = await self.get_video_metadata(str(trimmed_path))
-            new_duration = new_metadata.duration
+            file_size = trimmed_path.stat().st_size
+            trimmed_metadata = None
+            if stream_copy:
+                # Keyframe-snapped cuts keep more than the requested spans,
+                # so take the real duration from the output
+                trimmed_metadata = await self.get_video_metadata(str(trimmed_path))
+                new_duration = trimmed_metadata.duration or new_duration
+                file_size = trimmed_metadata.file_size or file_size
             
-             # Update video record
+            # Re-read the record so edits made during the encode (e.g. subtitles) survive
+            video = await self.get_video(video_id) or video
+            
+            # Update video record, including the codecs/container just written
             video.filename = trimmed_filename
             video.metadata.duration = new_duration
+            video.metadata.file_size = file_size
+            if trimmed_metadata and trimmed_metadata.video_codec:
+                video.metadata.video_codec = trimmed_metadata.video_codec
+                video.metadata.audio_codec = trimmed_metadata.audio_codec
+                video.metadata.format = trimmed_metadata.format
+            elif not stream_copy:
+                _mark_encoded_mp4(video.metadata, copied_audio=False)
             await self.update_video(video)
             
             return original_duration, new_duration, len(silent_segments)
@@ -299,6 +622,8 @@ class VideoService:
             print(f"Trim failed: {e.stderr}")
             # Fallback
             return original_duration, original_duration, 0
+        finally:
+            concat_list_path.unlink(missing_ok=True)
 
     
     async def export_with_subtitles(
@@ -306,7 +631,11 @@ class VideoService:
         video_id: str,
         output_format: str = "mp4"
     ) -> str:
-        """Export video with burned-in subtitles using MoviePy + Pillow."""
+        """Export video with burned-in subtitles.
+        
+        Uses FFmpeg's libass `ass` filter when available (a single native
+        encode), falling back to overlaying Pillow-rendered PNGs otherwise.
+        """
         video = await self.get_video(video_id)
         if not video:
             raise ValueError(f"Video {video_id} not found")
@@ -320,225 +649,12 @@ class VideoService:
         await self.update_video(video)
         
         try:
-            from moviepy import VideoFileClip, ImageClip, CompositeVideoClip
-            from PIL import Image, ImageDraw, ImageFont
-            import numpy as np
-            
-            # Load video
-            clip = VideoFileClip(str(video_path))
-            
-            if video.subtitles:
-                text_clips = []
-                
-                # Detect language from subtitle text to choose font
-                def get_font_for_text(text):
-                    """Get appropriate font based on text content."""
-                    # Check for Hindi/Devanagari characters
-                    has_hindi = any('\u0900' <= c <= '\u097F' for c in text)
-                    # Check for Chinese/Japanese
-                    has_cjk = any('\u4E00' <= c <= '\u9FFF' or '\u3040' <= c <= '\u30FF' for c in text)
-                    # Check for Tamil
-                    has_tamil = any('\u0B80' <= c <= '\u0BFF' for c in text)
-                    # Check for Telugu
-                    has_telugu = any('\u0C00' <= c <= '\u0C7F' for c in text)
-                    
-                    if has_hindi:
-                        # Hindi fonts
-                        hindi_fonts = [
-                            "C:/Windows/Fonts/NirmalaUI.ttf",
-                            "C:/Windows/Fonts/mangal.ttf",
-                            "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
-                        ]
-                        for fp in hindi_fonts:
-                            if Path(fp).exists():
-                                return fp
-                    elif has_cjk:
-                        # CJK fonts
-                        cjk_fonts = [
-                            "C:/Windows/Fonts/msyh.ttc",
-                            "C:/Windows/Fonts/simsun.ttc",
-                        ]
-                        for fp in cjk_fonts:
-                            if Path(fp).exists():
-                                return fp
-                    elif has_tamil or has_telugu:
-                        tamil_fonts = [
-                            "C:/Windows/Fonts/NirmalaUI.ttf",
-                        ]
-                        for fp in tamil_fonts:
-                            if Path(fp).exists():
-                                return fp
-                    
-                    # Default English/Latin fonts
-                    english_fonts = [
-                        "C:/Windows/Fonts/arial.ttf",
-                        "C:/Windows/Fonts/segoeui.ttf",
-                        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                    ]
-                    for fp in english_fonts:
-                        if Path(fp).exists():
-                            return fp
-                    
-                    return None
-                
-                for sub in video.subtitles:
-                    text_content = sub.text
-                    font_path = get_font_for_text(text_content)
-                    
-                    # Professional subtitle style - optimized for 1080p landscape
-                    def make_subtitle_frame(t, text=text_content, fpath=font_path, video_width=int(clip.w), video_height=int(clip.h)):
-                        # For 1080p landscape (1920x1080), use ~40px font
-                        # Scale based on video dimensions
-                        is_landscape = video_width > video_height
-                        if is_landscape:
-                            # For landscape: 2.2% of width gives good readable size
-                            base_font_size = max(36, int(video_width * 0.022))
-                            max_text_width = int(video_width * 0.85)  # 85% of width for text
-                        else:
-                            # For portrait: smaller font, narrower width
-                            base_font_size = max(28, int(video_height * 0.028))
-                            max_text_width = int(video_width * 0.90)  # 90% of portrait width
-                        
-                        # Load font
-                        try:
-                            if fpath:
-                                font = ImageFont.truetype(fpath, base_font_size)
-                            else:
-                                font = ImageFont.load_default()
-                        except:
-                            font = ImageFont.load_default()
-                        
-                        # Wrap text to fit within max_text_width
-                        def wrap_text(text, font, max_width):
-                            """Wrap text to fit within max_width."""
-                            words = text.split()
-                            lines = []
-                            current_line = []
-                            
-                            temp_img = Image.new('RGBA', (1, 1))
-                            temp_draw = ImageDraw.Draw(temp_img)
-                            
-                            for word in words:
-                                test_line = ' '.join(current_line + [word])
-                                bbox = temp_draw.textbbox((0, 0), test_line, font=font)
-                                line_width = bbox[2] - bbox[0]
-                                
-                                if line_width <= max_width:
-                                    current_line.append(word)
-                                else:
-                                    if current_line:
-                                        lines.append(' '.join(current_line))
-                                    current_line = [word]
-                            
-                            if current_line:
-                                lines.append(' '.join(current_line))
-                            
-                            return lines if lines else [text]
-                        
-                        # Get wrapped lines
-                        lines = wrap_text(text, font, max_text_width)
-                        
-                        # Calculate line dimensions
-                        temp_img = Image.new('RGBA', (1, 1))
-                        temp_draw = ImageDraw.Draw(temp_img)
-                        
-                        line_heights = []
-                        line_widths = []
-                        for line in lines:
-                            bbox = temp_draw.textbbox((0, 0), line, font=font)
-                            line_widths.append(bbox[2] - bbox[0])
-                            line_heights.append(bbox[3] - bbox[1])
-                        
-                        max_line_width = max(line_widths) if line_widths else 100
-                        line_height = max(line_heights) if line_heights else base_font_size
-                        line_spacing = int(line_height * 0.3)  # 30% spacing between lines
-                        
-                        # Padding scales with font size
-                        padding_x = max(20, base_font_size // 2)
-                        padding_y = max(12, base_font_size // 3)
-                        
-                        total_text_height = (line_height * len(lines)) + (line_spacing * (len(lines) - 1))
-                        box_width = max_line_width + (padding_x * 2)
-                        box_height = total_text_height + (padding_y * 2)
-                        
-                        # Create image - full width of video for proper centering
-                        img_height = box_height + 10
-                        img = Image.new('RGBA', (video_width, img_height), (0, 0, 0, 0))
-                        draw = ImageDraw.Draw(img)
-                        
-                        # Center the box horizontally
-                        box_x = (video_width - box_width) // 2
-                        box_y = 5
-                        
-                        # Semi-transparent black background
-                        bg_color = (0, 0, 0, 200)  # 78% opacity
-                        
-                        # Draw the background box
-                        draw.rectangle(
-                            [(box_x, box_y), (box_x + box_width, box_y + box_height)],
-                            fill=bg_color
-                        )
-                        
-                        # Draw each line of text
-                        outline_color = (0, 0, 0, 255)
-                        text_color = (255, 255, 255, 255)
-                        
-                        current_y = box_y + padding_y
-                        for i, line in enumerate(lines):
-                            # Center each line within the box
-                            line_bbox = draw.textbbox((0, 0), line, font=font)
-                            line_width = line_bbox[2] - line_bbox[0]
-                            text_x = box_x + (box_width - line_width) // 2
-                            
-                            # Quick 1px outline (faster than 2px)
-                            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                draw.text((text_x + dx, current_y + dy), line, font=font, fill=outline_color)
-                            
-                            # Main white text
-                            draw.text((text_x, current_y), line, font=font, fill=text_color)
-                            
-                            current_y += line_height + line_spacing
-                        
-                        return np.array(img)
-                    
-                    # Create image clip
-                    duration = sub.end_time - sub.start_time
-                    subtitle_img = make_subtitle_frame(0)
-                    
-                    img_clip = ImageClip(subtitle_img, duration=duration)
-                    # Position inside video frame with safe margin from bottom
-                    # Use 8% of video height as bottom margin to ensure subtitle stays within frame
-                    bottom_margin = max(60, int(clip.h * 0.08))
-                    y_position = clip.h - subtitle_img.shape[0] - bottom_margin
-                    # Ensure we don't go negative (stays within video frame)
-                    y_position = max(0, min(y_position, clip.h - subtitle_img.shape[0]))
-                    img_clip = img_clip.with_position(('center', y_position))
-                    img_clip = img_clip.with_start(sub.start_time)
-                    
-                    text_clips.append(img_clip)
-                
-                final_clip = CompositeVideoClip([clip] + text_clips)
+            if not video.subtitles:
+                await self._export_unchanged(video.metadata, video_path, output_path)
+            elif settings.has_libass:
+                await self._export_with_ass(video, video_path, output_path)
             else:
-                final_clip = clip
-            
-            # Write output - OPTIMIZED FOR SPEED
-            # Using ultrafast preset for significantly faster encoding
-            # Trade-off: slightly larger file size but 3-5x faster
-            final_clip.write_videofile(
-                str(output_path),
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile=str(settings.TEMP_DIR / f"{video_id}_temp_audio.m4a"),
-                remove_temp=True,
-                fps=clip.fps or 30,
-                preset='ultrafast',  # Much faster than 'medium'
-                threads=8,  # Use more CPU threads
-                ffmpeg_params=['-crf', '23']  # Balanced quality/speed
-            )
-            
-            # Cleanup
-            final_clip.close()
-            clip.close()
+                await self._export_with_overlays(video, video_path, output_path)
             
             video.status = VideoStatus.EXPORTED
             video.exported_path = str(output_path)
@@ -555,6 +671,341 @@ class VideoService:
             await self.update_video(video)
             raise e
     
+    async def finalize_export(
+        self,
+        video_id: str,
+        *,
+        trim_silence: bool = False,
+        to_landscape: bool = False,
+        burn_subs: bool = True,
+        output_format: str = "mp4",
+        silence_threshold: float = -40,
+        min_silence_duration: float = 0.5,
+        padding: float = 0.1,
+        target_width: int = 1920,
+        target_height: int = 1080,
+        background_blur: bool = True
+    ) -> str:
+        """Export with silence trimming, landscape framing and subtitles in one encode.
+        
+        Chains trim/concat -> landscape scale/overlay -> subtitles in a single
+        filter graph, so the footage is encoded once and no intermediate videos
+        are written. The source video file is left untouched.
+        """
+        video = await self.get_video(video_id)
+        if not video:
+            raise ValueError(f"Video {video_id} not found")
+        
+        video_path = self.get_video_path(video)
+        metadata = video.metadata
+        subtitles = video.subtitles if burn_subs else []
+        output_filename = f"{video_id}_exported.{output_format}"
+        output_path = settings.EXPORT_DIR / output_filename
+        
+        # Update status
+        video.status = VideoStatus.EXPORTING
+        await self.update_video(video)
+        
+        work_dir = settings.TEMP_DIR / f"{video_id}_finalize"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            input_args = []
+            filter_parts = []
+            video_label = "[0:v]"
+            audio_map = "0:a?"
+            audio_codec_args = _audio_codec_args(metadata)
+            
+            if trim_silence:
+                silent_segments = await self._detect_silence_in_file(
+                    video_path, silence_threshold, min_silence_duration
+                )
+                keep_segments = self._keep_segments(silent_segments, metadata.duration, padding)
+                if silent_segments and keep_segments:
+                    filter_parts += self._trim_filter(keep_segments)
+                    video_label = "[trimv]"
+                    audio_map = "[trima]"
+                    audio_codec_args = ["-c:a", "aac", "-b:a", "128k"]
+                    # Subtitles are timed against the source; move them onto the cut timeline
+                    subtitles = self._retime_subtitles(subtitles, keep_segments)
+            
+            if to_landscape and metadata.width < metadata.height:
+                filter_parts.append(self._landscape_filter(
+                    metadata.width, metadata.height, target_width, target_height,
+                    background_blur, in_label=video_label, out_label="[landv]"
+                ))
+                video_label = "[landv]"
+                metadata = metadata.model_copy(
+                    update={"width": target_width, "height": target_height}
+                )
+            
+            if subtitles and settings.has_libass:
+                ass_filename = f"{video_id}.ass"
+                (work_dir / ass_filename).write_text(
+                    self._build_ass_subtitles(subtitles, metadata),
+                    encoding="utf-8"
+                )
+                filter_parts.append(f"{video_label}ass={ass_filename}[subv]")
+                video_label = "[subv]"
+            elif subtitles:
+                input_args, overlay_parts, video_label = await self._overlay_filter(
+                    subtitles, metadata.width, metadata.height, work_dir, in_label=video_label
+                )
+                filter_parts += overlay_parts
+            
+            if filter_parts:
+                # Run from work_dir so the ass filter argument, the overlay
+                # PNGs and the filter script are all bare filenames
+                await self._run_ffmpeg_export(
+                    video_path, output_path,
+                    [
+                        *input_args,
+                        *self._filter_script_args(filter_parts, work_dir),
+                        "-map", video_label, "-map", audio_map
+                    ],
+                    [*_video_encoder_args("ultrafast"), *audio_codec_args],
+                    cwd=work_dir
+                )
+            else:
+                await self._export_unchanged(metadata, video_path, output_path)
+            
+            video.status = VideoStatus.EXPORTED
+            video.exported_path = str(output_path)
+            await self.update_video(video)
+            
+            print(f"✅ Finalized export with {len(subtitles)} subtitles in a single pass")
+            return str(output_path)
+            
+        except Exception as e:
+            print(f"Export error: {e}")
+            video.status = VideoStatus.ERROR
+            await self.update_video(video)
+            raise e
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    async def _export_unchanged(
+        self,
+        metadata: Optional[VideoMetadata],
+        video_path: Path,
+        output_path: Path
+    ):
+        """Export with nothing burned in: remux when MP4 can hold the streams, else re-encode."""
+        if _can_remux_to_mp4(metadata):
+            codec_args = ["-c", "copy"]
+        else:
+            codec_args = [*_video_encoder_args("ultrafast"), *_audio_codec_args(metadata)]
+        await self._run_ffmpeg_export(video_path, output_path, [], codec_args)
+    
+    async def _run_ffmpeg_export(
+        self,
+        video_path: Path,
+        output_path: Path,
+        filter_args: List[str],
+        codec_args: List[str],
+        cwd: Optional[Path] = None
+    ):
+        """Run a single FFmpeg export pass.
+        
+        `filter_args` follows the main input, so it may add extra inputs
+        (e.g. overlay images) ahead of the filter options.
+        """
+        cmd = [
+            settings.ffmpeg_binary, "-y",
+            "-nostdin", "-v", "error",
+            "-i", str(video_path),
+            *filter_args,
+            *codec_args,
+            str(output_path)
+        ]
+        await _run_encode(cmd, cwd=cwd)
+    
+    async def _export_with_ass(self, video: Video, video_path: Path, output_path: Path):
+        """Burn subtitles in with FFmpeg + libass, copying the audio stream."""
+        ass_filename = f"{video.id}.ass"
+        ass_path = settings.TEMP_DIR / ass_filename
+        ass_path.write_text(
+            self._build_ass_subtitles(video.subtitles, video.metadata),
+            encoding="utf-8"
+        )
+        try:
+            # Run from TEMP_DIR so the filter argument is a bare filename and
+            # needs no filtergraph escaping (e.g. Windows drive colons)
+            await self._run_ffmpeg_export(
+                video_path, output_path,
+                ["-vf", f"ass={ass_filename}"],
+                [*_video_encoder_args("ultrafast"), *_audio_codec_args(video.metadata)],
+                cwd=settings.TEMP_DIR
+            )
+        finally:
+            ass_path.unlink(missing_ok=True)
+    
+    def _build_ass_subtitles(
+        self,
+        subtitles: List[SubtitleSegment],
+        metadata: VideoMetadata
+    ) -> str:
+        """Build an ASS script for the subtitles, one style per distinct SubtitleStyle."""
+        width = metadata.width or 1920
+        height = metadata.height or 1080
+        
+        # Same sizing as the Pillow renderer, scaled by the style's font size
+        if width > height:
+            base_font_size = max(36, int(width * 0.022))
+        else:
+            base_font_size = max(28, int(height * 0.028))
+        margin_v = max(60, int(height * 0.08))
+        alignments = {"top": 8, "center": 5, "bottom": 2}
+        
+        def ass_color(hex_color: str) -> str:
+            # "#RRGGBB" -> "&H00BBGGRR"
+            rgb = hex_color.lstrip("#").upper().ljust(6, "0")
+            return f"&H00{rgb[4:6]}{rgb[2:4]}{rgb[0:2]}"
+        
+        def ass_time(seconds: float) -> str:
+            centis = int(round(max(0.0, seconds) * 100))
+            hours, centis = divmod(centis, 360000)
+            minutes, centis = divmod(centis, 6000)
+            secs, centis = divmod(centis, 100)
+            return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+        
+        style_names = {}
+        style_lines = []
+        event_lines = []
+        for sub in subtitles:
+            style = sub.style
+            key = tuple(style.model_dump().values())
+            if key not in style_names:
+                name = f"S{len(style_names)}"
+                style_names[key] = name
+                font_size = round(base_font_size * style.font_size / settings.DEFAULT_FONT_SIZE)
+                style_lines.append(
+                    f"Style: {name},{style.font_family},{font_size},"
+                    f"{ass_color(style.font_color)},&H000000FF,"
+                    f"{ass_color(style.outline_color)},&H00000000,"
+                    f"{-1 if style.bold else 0},{-1 if style.italic else 0},0,0,"
+                    f"100,100,0,0,1,{style.outline_width},0,"
+                    f"{alignments.get(style.position, 2)},"
+                    f"{int(width * 0.075)},{int(width * 0.075)},{margin_v},1"
+                )
+            text = sub.text.replace("\\", "\\\\").replace("{", "\\{").replace("\n", "\\N")
+            event_lines.append(
+                f"Dialogue: 0,{ass_time(sub.start_time)},{ass_time(sub.end_time)},"
+                f"{style_names[key]},,0,0,0,,{text}"
+            )
+        
+        return "\n".join([
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {width}",
+            f"PlayResY: {height}",
+            "WrapStyle: 0",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+            "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
+            "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+            "Alignment, MarginL, MarginR, MarginV, Encoding",
+            *style_lines,
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+            *event_lines,
+            ""
+        ])
+    
+    async def _export_with_overlays(self, video: Video, video_path: Path, output_path: Path):
+        """Burn subtitles in by overlaying Pillow-rendered PNGs with FFmpeg."""
+        png_dir = settings.TEMP_DIR / f"{video.id}_subs"
+        png_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            input_args, filter_parts, last_label = await self._overlay_filter(
+                video.subtitles, video.metadata.width, video.metadata.height, png_dir
+            )
+            
+            # One FFmpeg pass overlays every PNG in its time window; run from
+            # png_dir so the PNG inputs and filter script are bare filenames
+            await self._run_ffmpeg_export(
+                video_path, output_path,
+                [
+                    *input_args,
+                    *self._filter_script_args(filter_parts, png_dir),
+                    "-map", last_label, "-map", "0:a?"
+                ],
+                [*_video_encoder_args("ultrafast"), *_audio_codec_args(video.metadata)],
+                cwd=png_dir
+            )
+        finally:
+            shutil.rmtree(png_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _filter_script_args(filter_parts: List[str], work_dir: Path) -> List[str]:
+        """Write a filter graph to work_dir and return the args that load it.
+        
+        Overlay graphs grow with every subtitle cue, so they go in a file
+        rather than on the command line (ffmpeg must run with cwd=work_dir).
+        """
+        script_name = "filter_complex.txt"
+        (work_dir / script_name).write_text(";\n".join(filter_parts), encoding="utf-8")
+        return ["-filter_complex_script", script_name]
+    
+    async def _overlay_filter(
+        self,
+        subtitles: List[SubtitleSegment],
+        video_w: int,
+        video_h: int,
+        png_dir: Path,
+        in_label: str = "[0:v]"
+    ) -> Tuple[List[str], List[str], str]:
+        """Render subtitle PNGs into png_dir and chain overlays for them onto in_label.
+        
+        Returns (extra input args, filter_complex parts, output label); the PNGs
+        are inputs 1..N, after the main video, named relative to png_dir.
+        """
+        # Render each distinct text once (repeated lines like "[Music]" share a PNG);
+        # short lists in a thread, long ones across the shared process pool
+        texts = list(dict.fromkeys(sub.text for sub in subtitles))
+        png_paths = {text: png_dir / f"sub_{i}.png" for i, text in enumerate(texts)}
+        if len(texts) <= _INLINE_RENDER_MAX:
+            heights = await asyncio.to_thread(
+                _render_subtitle_pngs, texts, video_w, video_h, png_paths
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            pool = _render_pool()
+            heights = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool, render_subtitle_png, text, video_w, video_h, str(png_paths[text])
+                )
+                for text in texts
+            ))
+        img_heights = dict(zip(texts, heights))
+        
+        input_args = []
+        filter_parts = []
+        last_label = in_label
+        
+        for i, sub in enumerate(subtitles):
+            input_args += ["-i", png_paths[sub.text].name]
+            img_height = img_heights[sub.text]
+            
+            # Position inside video frame with safe margin from bottom
+            # Use 8% of video height as bottom margin to ensure subtitle stays within frame
+            bottom_margin = max(60, int(video_h * 0.08))
+            y_position = video_h - img_height - bottom_margin
+            # Ensure we don't go negative (stays within video frame)
+            y_position = max(0, min(y_position, video_h - img_height))
+            
+            filter_parts.append(
+                f"{last_label}[{i + 1}:v]overlay=x=(W-w)/2:y={y_position}:"
+                f"enable='between(t,{sub.start_time},{sub.end_time})'[sub{i + 1}]"
+            )
+            last_label = f"[sub{i + 1}]"
+        
+        return input_args, filter_parts, last_label
+    
     def _create_subtitle_filters(
         self,
         subtitles: List[SubtitleSegment],
@@ -602,6 +1053,44 @@ class VideoService:
         
         return filters
 
+    def _landscape_filter(
+        self,
+        width: int,
+        height: int,
+        target_width: int,
+        target_height: int,
+        background_blur: bool,
+        in_label: str = "[0:v]",
+        out_label: str = "[outv]"
+    ) -> str:
+        """filter_complex centering a width x height video in a target-size landscape frame."""
+        # Calculate scaling to fit portrait video in landscape frame
+        # while maintaining aspect ratio
+        scale_factor = min(target_width / width, target_height / height)
+        scaled_width = int(width * scale_factor)
+        scaled_height = int(height * scale_factor)
+        
+        # Make sure dimensions are even (required by many codecs)
+        scaled_width = scaled_width if scaled_width % 2 == 0 else scaled_width - 1
+        scaled_height = scaled_height if scaled_height % 2 == 0 else scaled_height - 1
+        
+        if background_blur:
+            # Create a blurred, scaled background + centered original video
+            # Filter: scale background to fill, blur it, overlay original centered
+            return (
+                f"{in_label}split[bgsrc][fgsrc];"
+                f"[bgsrc]scale={target_width}:{target_height}:force_original_aspect_ratio=increase,"
+                f"crop={target_width}:{target_height},boxblur=20:5[bg];"
+                f"[fgsrc]scale={scaled_width}:{scaled_height}[fg];"
+                f"[bg][fg]overlay=(W-w)/2:(H-h)/2{out_label}"
+            )
+        # Just center on black background
+        return (
+            f"{in_label}scale={scaled_width}:{scaled_height}[scaled];"
+            f"color=black:size={target_width}x{target_height}[bg];"
+            f"[bg][scaled]overlay=(W-w)/2:(H-h)/2:shortest=1{out_label}"
+        )
+    
     async def transform_to_landscape(
         self,
         video_id: str,
@@ -629,60 +1118,37 @@ class VideoService:
         if original_width >= original_height:
             return original_width, original_height, original_width, original_height
         
-        # Calculate scaling to fit portrait video in landscape frame
-        # while maintaining aspect ratio
-        scale_factor = min(target_width / original_width, target_height / original_height)
-        scaled_width = int(original_width * scale_factor)
-        scaled_height = int(original_height * scale_factor)
-        
-        # Make sure dimensions are even (required by many codecs)
-        scaled_width = scaled_width if scaled_width % 2 == 0 else scaled_width - 1
-        scaled_height = scaled_height if scaled_height % 2 == 0 else scaled_height - 1
-        
         # Output path
         landscape_filename = f"{video_id}_landscape.mp4"
         landscape_path = settings.UPLOAD_DIR / landscape_filename
         
-        if background_blur:
-            # Create a blurred, scaled background + centered original video
-            # Filter: scale background to fill, blur it, overlay original centered
-            filter_complex = (
-                f"[0:v]scale={target_width}:{target_height}:force_original_aspect_ratio=increase,"
-                f"crop={target_width}:{target_height},boxblur=20:5[bg];"
-                f"[0:v]scale={scaled_width}:{scaled_height}[fg];"
-                f"[bg][fg]overlay=(W-w)/2:(H-h)/2[outv]"
-            )
-        else:
-            # Just center on black background
-            filter_complex = (
-                f"[0:v]scale={scaled_width}:{scaled_height}[scaled];"
-                f"color=black:size={target_width}x{target_height}[bg];"
-                f"[bg][scaled]overlay=(W-w)/2:(H-h)/2[outv]"
-            )
+        filter_complex = self._landscape_filter(
+            original_width, original_height, target_width, target_height, background_blur
+        )
         
         cmd = [
             settings.ffmpeg_binary, "-y",
+            "-nostdin", "-v", "error",
             "-i", str(video_path),
             "-filter_complex", filter_complex,
             "-map", "[outv]", "-map", "0:a?",
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            "-c:a", "aac", "-b:a", "128k",
+            *_video_encoder_args("fast"),
+            *_audio_codec_args(video.metadata),
             str(landscape_path)
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
-            
-            # Get new metadata
-            new_metadata = await self.get_video_metadata(str(landscape_path))
+            await _run_encode(cmd)
             
-            # Update video record
+            # Output dimensions and codecs are known by construction, no need to re-probe
             video.filename = landscape_filename
-            video.metadata.width = new_metadata.width
-            video.metadata.height = new_metadata.height
+            video.metadata.width = target_width
+            video.metadata.height = target_height
+            video.metadata.file_size = landscape_path.stat().st_size
+            _mark_encoded_mp4(video.metadata, copied_audio=True)
             await self.update_video(video)
             
-            return original_width, original_height, new_metadata.width, new_metadata.height
+            return original_width, original_height, target_width, target_height
             
         except subprocess.CalledProcessError as e:
             print(f"Transform failed: {e.stderr}")
@@ -717,6 +1183,7 @@ class VideoService:
         
         cmd = [
             settings.ffmpeg_binary, "-y",
+            "-nostdin", "-v", "error",
             "-i", str(video_path),
             "-c:v", "copy", # Copy video stream without re-encoding
             "-af", af_string,
@@ -725,7 +1192,7 @@ class VideoService:
         ]
         
         try:
-            subprocess.run(cmd, check=True, capture_output=True)
+            await _run_encode(cmd)
             
             # Update record to point to enhanced video
             video.filename = enhanced_filename
@@ -749,29 +1216,40 @@ class VideoService:
         if not video:
             raise ValueError(f"Video {video_id} not found")
         
-        import random
-        clips = []
+        import numpy as np
+        
+        rng = _clip_rng()
         total_duration = video.metadata.duration
+        count = max(0, count)  # No clips (not an error) for non-positive counts
         
-        for i in range(count):
-            # Ensure we don't go out of bounds
-            if total_duration <= duration:
-                start = 0
-                end = total_duration
-            else:
-                max_start = max(0, total_duration - duration)
-                start = random.uniform(0, max_start)
-                end = min(total_duration, start + duration)
-            
-            clips.append({
-                "id": str(uuid.uuid4()),
-                "start_time": round(start, 2),
-                "end_time": round(end, 2),
-                "score": round(random.uniform(0.8, 0.99), 2),
-                "summary": f"Viral Highlight #{i+1} - Key moment detected"
-            })
-            
-        return clips
+        # Draw every clip's start and score in one vectorized call each.
+        # No branch for short videos: max_start is 0, so every start is 0
+        # and the end clamps to the video's duration
+        max_start = max(0.0, total_duration - duration)
+        starts = rng.uniform(0, max_start, size=count)
+        ends = np.minimum(total_duration, starts + duration)
+        scores = rng.uniform(0.8, 0.99, size=count)
+        
+        # One urandom read for all clip IDs; version=4 sets the RFC 4122 bits
+        raw = os.urandom(16 * count)
+        ids = [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+        
+        return [
+            {
+                "id": clip_id,
+                "start_time": start,
+                "end_time": end,
+                "score": score,
+                "summary": summary
+            }
+            for clip_id, start, end, score, summary in zip(
+                ids,
+                np.round(starts, 2).tolist(),
+                np.round(ends, 2).tolist(),
+                np.round(scores, 2).tolist(),
+                map("Viral Highlight #{} - Key moment detected".format, range(1, count + 1))
+            )
+        ]
 
     def is_portrait_video(self, video: Video) -> bool:
         """Check if video is in portrait/vertical orientation."""
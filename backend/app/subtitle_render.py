@@ -0,0 +1,194 @@
+"""Pillow rendering of subtitle boxes for the FFmpeg overlay export.
+
+Kept outside app.services so process-pool workers can import it without
+pulling in the service singletons (LLM clients, Redis, ...).
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+
+# Font candidates for the Pillow subtitle renderer, by script
+_SUBTITLE_FONTS = {
+    "devanagari": [
+        "C:/Windows/Fonts/NirmalaUI.ttf",
+        "C:/Windows/Fonts/mangal.ttf",
+        "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    ],
+    "cjk": [
+        "C:/Windows/Fonts/msyh.ttc",
+        "C:/Windows/Fonts/simsun.ttc",
+    ],
+    "tamil_telugu": [
+        "C:/Windows/Fonts/NirmalaUI.ttf",
+    ],
+    "latin": [
+        "C:/Windows/Fonts/arial.ttf",
+        "C:/Windows/Fonts/segoeui.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ],
+}
+
+
+def _text_script(text: str) -> str:
+    """Detect which font script a subtitle needs."""
+    if any('\u0900' <= c <= '\u097F' for c in text):
+        return "devanagari"
+    if any('\u4E00' <= c <= '\u9FFF' or '\u3040' <= c <= '\u30FF' for c in text):
+        return "cjk"
+    if any('\u0B80' <= c <= '\u0BFF' or '\u0C00' <= c <= '\u0C7F' for c in text):
+        return "tamil_telugu"
+    return "latin"
+
+
+@lru_cache(maxsize=None)
+def _font_path_for_script(script: str) -> Optional[str]:
+    """First installed font for a script, falling back to Latin fonts."""
+    for fp in _SUBTITLE_FONTS.get(script, []) + _SUBTITLE_FONTS["latin"]:
+        if Path(fp).exists():
+            return fp
+    return None
+
+
+def _font_for_text(text: str) -> Optional[str]:
+    """Get appropriate font based on text content."""
+    return _font_path_for_script(_text_script(text))
+
+
+@lru_cache(maxsize=32)
+def _load_font(fpath: Optional[str], size: int):
+    """Load (and cache) a TrueType font, or Pillow's default font."""
+    from PIL import ImageFont
+    if fpath:
+        try:
+            return ImageFont.truetype(fpath, size)
+        except OSError:
+            pass
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def _measure_draw():
+    """Shared 1x1 canvas used only for text measurement."""
+    from PIL import Image, ImageDraw
+    return ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+
+
+@lru_cache(maxsize=4096)
+def _text_bbox(text: str, font) -> Tuple[int, int, int, int]:
+    """Bounding box of text rendered in a (cached, so stable-identity) font."""
+    return _measure_draw().textbbox((0, 0), text, font=font)
+
+
+def _wrap_text(text: str, font, max_width: int) -> List[str]:
+    """Wrap text to fit within max_width."""
+    words = text.split()
+    lines = []
+    current_line = []
+    
+    # Measure each word once and sum, instead of re-measuring every candidate line
+    space_width = font.getlength(' ')
+    line_width = 0.0
+    
+    for word in words:
+        word_width = font.getlength(word)
+        test_width = line_width + space_width + word_width if current_line else word_width
+        
+        if test_width <= max_width:
+            current_line.append(word)
+            line_width = test_width
+        else:
+            if current_line:
+                lines.append(' '.join(current_line))
+            current_line = [word]
+            line_width = word_width
+    
+    if current_line:
+        lines.append(' '.join(current_line))
+    
+    return lines if lines else [text]
+
+
+def render_subtitle_png(text: str, video_width: int, video_height: int, out_path: str) -> int:
+    """Render one subtitle box to a transparent PNG and return its height.
+    
+    Top-level so it can run in a ProcessPoolExecutor worker.
+    """
+    from PIL import Image, ImageDraw
+    
+    # Professional subtitle style - optimized for 1080p landscape
+    # For 1080p landscape (1920x1080), use ~40px font
+    # Scale based on video dimensions
+    is_landscape = video_width > video_height
+    if is_landscape:
+        # For landscape: 2.2% of width gives good readable size
+        base_font_size = max(36, int(video_width * 0.022))
+        max_text_width = int(video_width * 0.85)  # 85% of width for text
+    else:
+        # For portrait: smaller font, narrower width
+        base_font_size = max(28, int(video_height * 0.028))
+        max_text_width = int(video_width * 0.90)  # 90% of portrait width
+    
+    # Load font (parsed once per path/size in each worker)
+    font = _load_font(_font_for_text(text), base_font_size)
+    
+    # Get wrapped lines
+    lines = _wrap_text(text, font, max_text_width)
+    
+    # Calculate line dimensions
+    line_heights = []
+    line_widths = []
+    for line in lines:
+        bbox = _text_bbox(line, font)
+        line_widths.append(bbox[2] - bbox[0])
+        line_heights.append(bbox[3] - bbox[1])
+    
+    max_line_width = max(line_widths) if line_widths else 100
+    line_height = max(line_heights) if line_heights else base_font_size
+    line_spacing = int(line_height * 0.3)  # 30% spacing between lines
+    
+    # Padding scales with font size
+    padding_x = max(20, base_font_size // 2)
+    padding_y = max(12, base_font_size // 3)
+    
+    total_text_height = (line_height * len(lines)) + (line_spacing * (len(lines) - 1))
+    box_width = max_line_width + (padding_x * 2)
+    box_height = total_text_height + (padding_y * 2)
+    
+    # Create image just big enough for the box; the overlay filter centers it
+    img_height = box_height + 10
+    img = Image.new('RGBA', (box_width + 1, img_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    
+    box_x = 0
+    box_y = 5
+    
+    # Semi-transparent black background
+    bg_color = (0, 0, 0, 200)  # 78% opacity
+    
+    # Draw the background box
+    draw.rectangle(
+        [(box_x, box_y), (box_x + box_width, box_y + box_height)],
+        fill=bg_color
+    )
+    
+    # Draw each line of text
+    outline_color = (0, 0, 0, 255)
+    text_color = (255, 255, 255, 255)
+    
+    current_y = box_y + padding_y
+    for i, line in enumerate(lines):
+        # Center each line within the box
+        text_x = box_x + (box_width - line_widths[i]) // 2
+        
+        # White text with a 1px outline, stroked in a single pass
+        draw.text(
+            (text_x, current_y), line, font=font, fill=text_color,
+            stroke_width=1, stroke_fill=outline_color
+        )
+        
+        current_y += line_height + line_spacing
+    
+    # Short-lived temp file: favour encode speed over size
+    img.save(out_path, compress_level=1)
+    return img_height
@@ -1,12 +1,44 @@
+"""Report which FFmpeg binaries imageio-ffmpeg and MoviePy resolve to."""
+from functools import lru_cache
+from typing import Optional
 
-try:
-    import imageio_ffmpeg
-    print(f"ImageIO FFmpeg: {imageio_ffmpeg.get_ffmpeg_exe()}")
-except ImportError:
-    print("imageio_ffmpeg not found")
 
-try:
+@lru_cache(maxsize=1)
+def _imageio_path() -> Optional[str]:
+    """FFmpeg bundled with imageio-ffmpeg, or None if it isn't installed."""
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+@lru_cache(maxsize=1)
+def _moviepy_path() -> str:
+    """FFmpeg binary MoviePy is configured to use (raises if MoviePy can't say)."""
     from moviepy.config import get_setting
-    print(f"MoviePy FFmpeg: {get_setting('FFMPEG_BINARY')}")
-except Exception as e:
-    print(f"MoviePy Error: {e}")
+    return get_setting('FFMPEG_BINARY')
+
+
+def resolve_ffmpeg() -> Optional[str]:
+    """First FFmpeg binary found via imageio-ffmpeg, then MoviePy."""
+    path = _imageio_path()
+    if path:
+        return path
+    try:
+        return _moviepy_path()
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    imageio_path = _imageio_path()
+    if imageio_path:
+        print(f"ImageIO FFmpeg: {imageio_path}")
+    else:
+        print("imageio_ffmpeg not found")
+
+    try:
+        print(f"MoviePy FFmpeg: {_moviepy_path()}")
+    except Exception as e:
+        print(f"MoviePy Error: {e}")
@@ -3,7 +3,8 @@ import os
 import sys
 import json
 import uuid
-import subprocess
+import shutil
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
@@ -11,9 +12,17 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent))
 
 # MOCK REDIS BEFORE IMPORTS
-from unittest.mock import MagicMock
-sys.modules["redis"] = MagicMock()
-sys.modules["redis.asyncio"] = MagicMock()
+class _NoRedis:
+    """Inert stand-in for the redis package: every attribute or call yields another stub."""
+    def __getattr__(self, _name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+_no_redis = _NoRedis()
+sys.modules.setdefault("redis", _no_redis)
+sys.modules.setdefault("redis.asyncio", _no_redis)
 
 from app.config import get_settings
 from app.models.video import Video, VideoStatus, VideoMetadata, SubtitleSegment, SubtitleStyle
@@ -24,6 +33,7 @@ class MockCacheService:
     def __init__(self):
         self.videos = {}
         self.chat_history = {}
+        self.values = {}
 
     async def connect(self):
         pass
@@ -31,6 +41,13 @@ class MockCacheService:
     async def disconnect(self):
         pass
 
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.values[key] = value
+        return True
+
     async def set_video(self, video_id, data):
         self.videos[video_id] = data
 
@@ -47,7 +64,7 @@ import app.services.cache_service
 app.services.cache_service.cache_service = MockCacheService()
 from app.services.cache_service import cache_service
 
-from app.services.video_service import video_service
+from app.services.video_service import video_service, _video_encoder_args
 from app.services.subtitle_service import subtitle_service
 from app.services.llm_service import llm_service
 
@@ -74,22 +91,39 @@ async def mock_parse_intent(state):
     state["response"] = "I've updated the font sizes as requested."
     return state
 
-# Inject mock into LLM Service if needed
-# We'll check if OPENAI_API_KEY is missing
 settings = get_settings()
-if not settings.OPENAI_API_KEY:
-    print("No OpenAI API Key found. Using Mock LLM.")
-    llm_service._parse_intent = mock_parse_intent
-else:
-    print("OpenAI API Key found. Using real LLM.")
-    # But wait, we might not want to spend quota. For demo, mocking is safer.
-    # user asked to share recording of prompted output. Real is better if possible.
-    # But I don't see the key.
+
+
+def _install_mocks() -> None:
+    """Inject the mock LLM into the LLM service, once per process."""
+    if getattr(llm_service, "_mocked", False):
+        return
+    # We'll check if OPENAI_API_KEY is missing
+    if not settings.OPENAI_API_KEY:
+        print("No OpenAI API Key found. Using Mock LLM.")
+    else:
+        print("OpenAI API Key found. Using real LLM.")
+        # But wait, we might not want to spend quota. For demo, mocking is safer.
+        # user asked to share recording of prompted output. Real is better if possible.
+        # But I don't see the key.
     llm_service._parse_intent = mock_parse_intent
+    llm_service._mocked = True
 
 async def main():
     print("--- Starting Demo Workflow ---")
+    _install_mocks()
     
+    # The generated clip and the trimmed copy are throwaway: keep uploads on
+    # tmpfs (RAM) when available and remove them afterwards
+    tmp_root = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    scratch_dir = Path(tempfile.mkdtemp(prefix="demo_uploads_", dir=tmp_root))
+    settings.UPLOAD_DIR = scratch_dir
+    try:
+        await run_demo()
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+async def run_demo():
     # 1. Create Dummy Video
     video_id = str(uuid.uuid4())
     filename = f"{video_id}.mp4"
@@ -98,22 +132,34 @@ async def main():
     print(f"Generating dummy video at {filepath}...")
     
     # Generate 15s video: 5s tone, 5s silence, 5s tone
-    # Video track: blue color
+    # Video track: blue color; audio synthesized in one aevalsrc (no concat)
+    # It's only a fixture, so encode as cheaply as possible: the hardware
+    # encoder the service picked if there is one, else x264 ultrafast
+    video_codec_args = _video_encoder_args("ultrafast")
+    if settings.video_encoder == "libx264":
+        video_codec_args += ["-tune", "stillimage"]
     cmd = [
         settings.ffmpeg_binary, "-y",
+        "-filter_threads", str(os.cpu_count() or 4),
         "-f", "lavfi", "-i", "color=c=blue:s=640x360:d=15",
-        "-f", "lavfi", "-i", "sine=f=440:d=5",
-        "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono:d=5",
-        "-f", "lavfi", "-i", "sine=f=880:d=5",
-        "-filter_complex", "[1:a][2:a][3:a]concat=n=3:v=0:a=1[a]",
-        "-map", "0:v", "-map", "[a]",
-        "-c:v", "libx264", "-c:a", "aac",
+        "-f", "lavfi", "-i", (
+            "aevalsrc='0.125*sin(440*2*PI*t)*lt(t,5)+0.125*sin(880*2*PI*t)*gte(t,10)'"
+            ":s=44100:d=15"
+        ),
+        *video_codec_args,
+        "-c:a", "aac",
         str(filepath)
     ]
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Failed to generate video: {result.stderr}")
+    # Encode without blocking the loop, connecting the cache meanwhile
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    (_, stderr), _ = await asyncio.gather(proc.communicate(), cache_service.connect())
+    if proc.returncode != 0:
+        print(f"Failed to generate video: {stderr.decode(errors='replace')}")
         return
 
     # Create Video Object
@@ -133,25 +179,34 @@ async def main():
     # Create 2 segments matching the audio (0-5, 10-15) - wait, silence is 5-10
     # Segment 1: 0.5s - 4.5s
     # Segment 2: 10.5s - 14.5s
+    # Both segments start out identical; the cache round-trip gives each its own copy
+    default_style = SubtitleStyle(font_size=24)
     subtitles = [
         SubtitleSegment(
             start_time=0.5, end_time=4.5, text="Hello world, this is the first clip.",
-            style=SubtitleStyle(font_size=24)
+            style=default_style
         ),
         SubtitleSegment(
             start_time=10.5, end_time=14.5, text="And this is the second clip with different font.",
-            style=SubtitleStyle(font_size=24)
+            style=default_style
         )
     ]
     video.subtitles = subtitles
     await video_service.update_video(video)
     print(subtitle_service.format_subtitles_for_display(subtitles))
 
-    # 3. Process Prompt via LangGraph
+    # 3 & 4. Process Prompt via LangGraph while trimming silence
+    # The LLM call is network-bound and the trim is FFmpeg work on disk,
+    # so run them concurrently; export waits for both
     user_prompt = "first clip has 15 font size then second clip has 20 font size"
     print(f"\nProcessing User Prompt: '{user_prompt}'")
+    print("--- Auto-Trimming Silence (concurrently) ---")
     
-    chat_response = await llm_service.process_chat(video_id, user_prompt, video.subtitles)
+    # Silence should be detected between 5s and 10s
+    chat_response, (original_dur, new_dur, segments) = await asyncio.gather(
+        llm_service.process_chat(video_id, user_prompt, video.subtitles),
+        video_service.trim_silence(video_id, silence_threshold=-30)
+    )
     
     print(f"Agent Response: {chat_response.message}")
     print("Applying edits...")
@@ -161,11 +216,7 @@ async def main():
     print("Updated Subtitles:")
     print(subtitle_service.format_subtitles_for_display(video.subtitles))
     
-    # 4. Trim Silence
-    print("\n--- Auto-Trimming Silence ---")
-    # Silence should be detected between 5s and 10s
-    original_dur, new_dur, segments = await video_service.trim_silence(video_id, silence_threshold=-30)
-    print(f"Trimmed {segments} silent segments.")
+    print(f"\nTrimmed {segments} silent segments.")
     print(f"Original Duration: {original_dur}, New Duration: {new_dur}")
     
     # 5. Export Video